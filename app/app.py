@@ -1,14 +1,28 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 import uuid
 import time
 import json
+import orjson
 import os
-from urllib.parse import urlparse
-from qbt_client import get_client, get_all_torrents
+import re
+import signal
+import tempfile
+import threading
+import qbittorrentapi
+from contextlib import contextmanager, suppress
+from qbt_client import get_client, iter_all_torrents, evict_client
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as JobExecutor
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # --- PATHS ---
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -26,16 +40,31 @@ DEFAULT_SETTINGS = {
     'discord_notification_enabled': False
 }
 
+# Parsed settings, reused until the file's mtime changes
+_SETTINGS_CACHE = {'mtime': None, 'data': None}
+
 def load_settings():
+    try:
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_SETTINGS
+
+    if mtime == _SETTINGS_CACHE['mtime']:
+        return _SETTINGS_CACHE['data']
+
     try:
         with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
+            data = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         return DEFAULT_SETTINGS
 
+    _SETTINGS_CACHE.update(mtime=mtime, data=data)
+    return data
+
 def save_settings(settings):
     with open(SETTINGS_FILE, 'w') as f:
         json.dump(settings, f, indent=4)
+    _SETTINGS_CACHE.update(mtime=os.stat(SETTINGS_FILE).st_mtime_ns, data=dict(settings))
 
 # Ensure the data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -47,6 +76,39 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Use WAL so dashboard reads don't block behind scheduler writes."""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64MB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA busy_timeout=30000")  # 30s
+    cursor.close()
+
+def _reset_isolation_level(dbapi_conn, connection_record):
+    """Undo writing()'s BEGIN IMMEDIATE once the connection returns to the pool."""
+    dbapi_conn.isolation_level = ''
+
+with app.app_context():
+    event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+    event.listen(db.engine, 'checkin', _reset_isolation_level)
+
+# Serializes background writes so scheduler threads don't queue on SQLite's single writer
+WRITE_LOCK = threading.Lock()
+
+@contextmanager
+def writing():
+    """Hold WRITE_LOCK and make the session's next write start with BEGIN IMMEDIATE.
+
+    The sqlite3 driver only opens a transaction right before the first write
+    statement, so reads issued earlier in the session are unaffected.
+    """
+    with WRITE_LOCK:
+        db.session.connection().connection.dbapi_connection.isolation_level = 'IMMEDIATE'
+        yield
+
 # Association table for the many-to-many relationship between Instance and Rule
 instance_rules = db.Table('instance_rules',
     db.Column('instance_id', db.Integer, db.ForeignKey('instance.id'), primary_key=True),
@@ -59,9 +121,9 @@ class Instance(db.Model):
     host = db.Column(db.String(200), nullable=False)
     username = db.Column(db.String(100))
     password = db.Column(db.String(100))
-    rules = db.relationship('Rule', secondary=instance_rules, lazy='subquery',
-        backref=db.backref('instances', lazy=True))
-    logs = db.relationship('ActionLog', backref='instance', lazy=True, cascade="all, delete-orphan")
+    rules = db.relationship('Rule', secondary=instance_rules, lazy='selectin',
+        backref=db.backref('instances', lazy='selectin'))
+    logs = db.relationship('ActionLog', back_populates='instance', lazy=True, cascade="all, delete-orphan")
     qbt_download_dir = db.Column(db.String(500))
     mapped_download_dir = db.Column(db.String(500))
     tag_nohardlinks = db.Column(db.Boolean, default=False)
@@ -72,7 +134,12 @@ class Instance(db.Model):
     orphaned_scan_enabled = db.Column(db.Boolean, default=False)
     orphaned_min_age_days = db.Column(db.Integer, default=7)
     orphaned_ignore_patterns = db.Column(db.Text, default='')
-    orphaned_files = db.relationship('OrphanedFile', backref='instance', lazy=True, cascade="all, delete-orphan")
+    orphaned_files = db.relationship('OrphanedFile', back_populates='instance', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index('ix_instance_mapped_dl_nn', 'mapped_download_dir',
+                 sqlite_where=db.text('mapped_download_dir IS NOT NULL')),
+    )
 
     def __repr__(self):
         return f'<Instance {self.name}>'
@@ -98,6 +165,11 @@ class ActionLog(db.Model):
     instance_id = db.Column(db.Integer, db.ForeignKey('instance.id'), nullable=False)
     action = db.Column(db.String(255), nullable=False)
     details = db.Column(db.Text, nullable=True)
+    instance = db.relationship('Instance', back_populates='logs')
+
+    __table_args__ = (
+        db.Index('ix_actionlog_ts_desc', timestamp.desc()),
+    )
 
 class OrphanedFile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -106,25 +178,60 @@ class OrphanedFile(db.Model):
     file_path = db.Column(db.Text, nullable=False)
     file_size = db.Column(db.BigInteger, nullable=True)
     file_mtime = db.Column(db.DateTime, nullable=True)
+    instance = db.relationship('Instance', back_populates='orphaned_files')
+
+    __table_args__ = (
+        db.Index('ix_orphan_instance_ts', instance_id, timestamp.desc()),
+    )
+
+def all_rules():
+    """Return all rules, queried at most once per request."""
+    if not hasattr(g, '_rules'):
+        g._rules = Rule.query.all()
+    return g._rules
+
+# Short-lived cache of instance status probes to absorb rapid page reloads
+STATUS_CACHE_TTL = 15  # seconds
+STATUS_PROBE_TIMEOUT = 3  # seconds
+_status_cache = {}
+
+def _probe_instance_status(instance):
+    """Query a single instance's qBittorrent version, returning (instance_id, status)."""
+    cache_key = (instance.host, instance.username, instance.password)
+    cached = _status_cache.get(cache_key)
+    if cached and cached[0] > time.time():
+        return instance.id, cached[1]
+
+    client = get_client(instance)
+    if client:
+        try:
+            version = client.app_version(requests_args={'timeout': STATUS_PROBE_TIMEOUT})
+            status = {'status': 'Online', 'version': version}
+        except Exception as e:
+            if isinstance(e, qbittorrentapi.APIConnectionError):
+                # Covers LoginFailed too; rebuild the pooled client on the next request
+                evict_client(instance)
+            status = {'status': 'Offline', 'error': f'An unexpected error occurred: {e}'}
+    else:
+        status = {'status': 'Offline', 'error': 'Could not connect. Check logs for details.'}
+
+    _status_cache[cache_key] = (time.time() + STATUS_CACHE_TTL, status)
+    return instance.id, status
+
+def get_instance_statuses(instances):
+    """Probe all instances concurrently so page latency is bounded by the slowest one."""
+    if not instances:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(16, len(instances))) as executor:
+        return dict(executor.map(_probe_instance_status, instances))
 
 @app.route('/')
 def index():
-    instances = Instance.query.all()
-    rules = Rule.query.all()
-    instance_statuses = {}
-    for instance in instances:
-        client = get_client(instance)
-        if client:
-            try:
-                version = client.app_version()
-                instance_statuses[instance.id] = {'status': 'Online', 'version': version}
-            except Exception as e:
-                instance_statuses[instance.id] = {'status': 'Offline', 'error': f'An unexpected error occurred: {e}'}
-
-        else:
-            instance_statuses[instance.id] = {'status': 'Offline', 'error': 'Could not connect. Check logs for details.'}
+    instances = Instance.query.options(selectinload(Instance.rules)).all()
+    rules = all_rules()
+    instance_statuses = get_instance_statuses(instances)
 
-    logs = ActionLog.query.order_by(ActionLog.timestamp.desc()).limit(20).all()
+    logs = ActionLog.query.options(joinedload(ActionLog.instance)).order_by(ActionLog.timestamp.desc()).limit(20).all()
 
     return render_template('index.html', 
                            instances=instances, 
@@ -134,14 +241,14 @@ def index():
 
 @app.route('/instances/<instance_id>/assign-rule', methods=['POST'])
 def assign_rule(instance_id):
-    instance = Instance.query.get_or_404(instance_id)
+    instance = db.get_or_404(Instance, instance_id)
     rule_id = request.form.get('rule_id')
 
     if not rule_id:
         flash('Please select a rule to assign.', 'warning')
         return redirect(url_for('index'))
 
-    rule = Rule.query.get_or_404(rule_id)
+    rule = db.get_or_404(Rule, rule_id)
     
     if rule not in instance.rules:
         instance.rules.append(rule)
@@ -154,8 +261,8 @@ def assign_rule(instance_id):
 
 @app.route('/instances/<instance_id>/remove-rule/<rule_id>', methods=['POST'])
 def remove_rule_from_instance(instance_id, rule_id):
-    instance = Instance.query.get_or_404(instance_id)
-    rule = Rule.query.get_or_404(rule_id)
+    instance = db.get_or_404(Instance, instance_id)
+    rule = db.get_or_404(Rule, rule_id)
     
     if rule in instance.rules:
         instance.rules.remove(rule)
@@ -169,7 +276,7 @@ def remove_rule_from_instance(instance_id, rule_id):
 @app.route('/logs/clear', methods=['POST'])
 def clear_logs():
     try:
-        num_rows_deleted = db.session.query(ActionLog).delete()
+        num_rows_deleted = db.session.query(ActionLog).delete(synchronize_session=False)
         db.session.commit()
         flash(f'Successfully cleared {num_rows_deleted} log entries.', 'success')
     except Exception as e:
@@ -180,7 +287,7 @@ def clear_logs():
 @app.route('/telegram/clear', methods=['POST'])
 def clear_telegram_messages():
     try:
-        num_rows_deleted = db.session.query(TelegramMessage).delete()
+        num_rows_deleted = db.session.query(TelegramMessage).delete(synchronize_session=False)
         db.session.commit()
         flash(f'Successfully cleared {num_rows_deleted} Telegram messages.', 'success')
     except Exception as e:
@@ -207,9 +314,11 @@ def settings():
 
     return render_template('settings.html', settings=load_settings())
 
-def group_orphaned_files_by_directory(orphaned_files):
+def group_orphaned_files_by_directory(orphaned_files, instances_map):
     """
     Group orphaned files by their common parent directories.
+    `orphaned_files` may be any iterable of rows exposing id, instance_id,
+    file_path and file_size; `instances_map` maps instance ids to Instances.
     Returns a structure like:
     {
         'instance_id': {
@@ -228,35 +337,33 @@ def group_orphaned_files_by_directory(orphaned_files):
     """
     from collections import defaultdict
     
-    # First, organize files by instance
-    files_by_instance = defaultdict(list)
-    instances_map = {}
+    # Single pass: bucket files by instance, then by immediate parent directory
+    buckets = {}
     for f in orphaned_files:
-        files_by_instance[f.instance_id].append(f)
-        instances_map[f.instance_id] = f.instance
+        bucket = buckets.get(f.instance_id)
+        if bucket is None:
+            bucket = buckets[f.instance_id] = (instances_map[f.instance_id], defaultdict(list))
+        bucket[1][os.path.dirname(f.file_path)].append(f)
     
     result = {}
     
-    for instance_id, files in files_by_instance.items():
-        # Group files by their immediate parent directory
-        files_by_parent = defaultdict(list)
-        for f in files:
-            parent = os.path.dirname(f.file_path)
-            files_by_parent[parent].append(f)
-        
+    for instance_id, (instance, files_by_parent) in buckets.items():
         # Merge child directories into their parent group when both exist.
         # E.g. if we have groups for /downloads/Movie and /downloads/Movie/Subs,
         # merge Subs into the Movie group. Sort by depth (shallowest first) so
-        # parents are processed before children.
+        # parents are processed before children; merged roots never nest, so
+        # walking up a directory's own ancestors finds at most one of them.
         sorted_dirs = sorted(files_by_parent.keys(), key=lambda d: d.count('/'))
         merged = {}
         for d in sorted_dirs:
             merged_into = None
-            for existing_dir in merged:
-                if d.startswith(existing_dir + '/'):
-                    merged_into = existing_dir
+            i = d.rfind('/')
+            while i != -1:
+                if d[:i] in merged:
+                    merged_into = d[:i]
                     break
-            if merged_into:
+                i = d.rfind('/', 0, i)
+            if merged_into is not None:
                 merged[merged_into].extend(files_by_parent[d])
             else:
                 merged[d] = list(files_by_parent[d])
@@ -283,7 +390,7 @@ def group_orphaned_files_by_directory(orphaned_files):
         groups.sort(key=lambda x: x['directory'])
         
         result[instance_id] = {
-            'instance': instances_map[instance_id],
+            'instance': instance,
             'groups': groups,
             'ungrouped': ungrouped
         }
@@ -292,53 +399,71 @@ def group_orphaned_files_by_directory(orphaned_files):
 
 @app.route('/orphaned-files')
 def orphaned_files():
-    instances = Instance.query.all()
-    orphaned = OrphanedFile.query.order_by(OrphanedFile.timestamp.desc()).all()
-    grouped_files = group_orphaned_files_by_directory(orphaned)
-    return render_template('orphaned_files.html', instances=instances, orphaned_files=orphaned, grouped_files=grouped_files)
+    instances = Instance.query.options(raiseload(Instance.rules)).all()
+    # Stream only the columns the page renders instead of full ORM objects
+    orphaned = db.session.execute(
+        db.select(
+            OrphanedFile.id,
+            OrphanedFile.instance_id,
+            OrphanedFile.file_path,
+            OrphanedFile.file_size,
+            OrphanedFile.file_mtime,
+            OrphanedFile.timestamp
+        ).order_by(OrphanedFile.timestamp.desc()).execution_options(yield_per=1000)
+    )
+    grouped_files = group_orphaned_files_by_directory(orphaned, {i.id: i for i in instances})
+    return render_template('orphaned_files.html', instances=instances, orphaned_files=bool(grouped_files), grouped_files=grouped_files)
+
+def _check_write_permission(instance):
+    """Try to create and delete a test file in the instance's mapped directory."""
+    mapped_dir = instance.mapped_download_dir
+    test_file = os.path.join(mapped_dir, '.qpanel_permission_test')
+    try:
+        with open(test_file, 'w') as f:
+            f.write('')
+        os.remove(test_file)
+        return {'status': 'ok', 'name': instance.name, 'path': mapped_dir}
+    except PermissionError:
+        return {'status': 'error', 'name': instance.name, 'path': mapped_dir, 'error': 'Permission denied'}
+    except Exception as e:
+        return {'status': 'error', 'name': instance.name, 'path': mapped_dir, 'error': str(e)}
 
 @app.route('/api/orphaned-files/check-permissions')
 def check_orphaned_permissions():
     """Check write permissions for all configured instance mapped directories."""
-    instances = Instance.query.filter(Instance.mapped_download_dir.isnot(None)).all()
-    results = {}
+    instances = [
+        i for i in Instance.query.filter(Instance.mapped_download_dir.isnot(None)).all()
+        if i.mapped_download_dir
+    ]
+    if not instances:
+        return jsonify({})
     
-    for instance in instances:
-        mapped_dir = instance.mapped_download_dir
-        if not mapped_dir:
-            continue
-            
-        test_file = os.path.join(mapped_dir, '.qpanel_permission_test')
-        try:
-            # Try to create and delete a test file
-            with open(test_file, 'w') as f:
-                f.write('')
-            os.remove(test_file)
-            results[instance.id] = {'status': 'ok', 'name': instance.name, 'path': mapped_dir}
-        except PermissionError:
-            results[instance.id] = {'status': 'error', 'name': instance.name, 'path': mapped_dir, 'error': 'Permission denied'}
-        except Exception as e:
-            results[instance.id] = {'status': 'error', 'name': instance.name, 'path': mapped_dir, 'error': str(e)}
+    # Mapped directories are often network mounts, so probe them in parallel
+    with ThreadPoolExecutor(max_workers=min(8, len(instances))) as executor:
+        results = dict(zip((i.id for i in instances), executor.map(_check_write_permission, instances)))
     
     return jsonify(results)
 
+def _remap_path(path, old_prefix, new_prefix):
+    """Swap a leading old_prefix for new_prefix, leaving other paths untouched."""
+    return new_prefix + path[len(old_prefix):] if path.startswith(old_prefix) else path
+
 @app.route('/api/orphaned-files/delete-file/<int:file_id>', methods=['POST'])
 def delete_orphaned_file_from_disk(file_id):
     """Delete an orphaned file from disk and remove from database."""
-    orphaned_file = OrphanedFile.query.get_or_404(file_id)
+    orphaned_file = db.get_or_404(OrphanedFile, file_id)
     instance = orphaned_file.instance
     
     # Convert qBt path to local mapped path
     file_path = orphaned_file.file_path
     if instance.qbt_download_dir and instance.mapped_download_dir:
-        if file_path.startswith(instance.qbt_download_dir):
-            file_path = file_path.replace(instance.qbt_download_dir, instance.mapped_download_dir, 1)
+        file_path = _remap_path(file_path, instance.qbt_download_dir, instance.mapped_download_dir)
     
     errors = []
     deleted_path = orphaned_file.file_path
     
     try:
-        if os.path.exists(file_path):
+        with suppress(FileNotFoundError):
             os.remove(file_path)
         # Remove from database
         db.session.delete(orphaned_file)
@@ -350,6 +475,11 @@ def delete_orphaned_file_from_disk(file_id):
         db.session.rollback()
         return jsonify({'status': 'error', 'message': f'Error deleting {deleted_path}: {str(e)}'}), 500
 
+def _is_dir_empty(path):
+    """Check emptiness by reading at most one directory entry."""
+    with os.scandir(path) as it:
+        return next(it, None) is None
+
 @app.route('/api/orphaned-files/delete-folder', methods=['POST'])
 def delete_orphaned_folder():
     """Delete all orphaned files in a folder from disk and remove from database."""
@@ -361,24 +491,37 @@ def delete_orphaned_folder():
     
     results = {'deleted': [], 'errors': []}
     
+    # Load all requested rows (and their instances) in a single query
+    orphaned_by_id = {
+        f.id: f for f in OrphanedFile.query.options(joinedload(OrphanedFile.instance))
+        .filter(OrphanedFile.id.in_(file_ids)).all()
+    }
+    deleted_ids = []
+    # Per-instance (qbt_dir, mapped_dir, len(qbt_dir)), resolved once per instance
+    mappings = {}
+    
     for file_id in file_ids:
-        orphaned_file = OrphanedFile.query.get(file_id)
+        orphaned_file = orphaned_by_id.get(file_id)
         if not orphaned_file:
             results['errors'].append({'id': file_id, 'error': 'File not found in database'})
             continue
             
-        instance = orphaned_file.instance
+        mapping = mappings.get(orphaned_file.instance_id)
+        if mapping is None:
+            instance = orphaned_file.instance
+            qbt_dir, mapped_dir = instance.qbt_download_dir, instance.mapped_download_dir
+            mapping = mappings[orphaned_file.instance_id] = (qbt_dir, mapped_dir, len(qbt_dir) if qbt_dir else 0)
+        qbt_dir, mapped_dir, qbt_dir_len = mapping
         file_path = orphaned_file.file_path
         
         # Convert qBt path to local mapped path
-        if instance.qbt_download_dir and instance.mapped_download_dir:
-            if file_path.startswith(instance.qbt_download_dir):
-                file_path = file_path.replace(instance.qbt_download_dir, instance.mapped_download_dir, 1)
+        if qbt_dir and mapped_dir and file_path.startswith(qbt_dir):
+            file_path = mapped_dir + file_path[qbt_dir_len:]
         
         try:
-            if os.path.exists(file_path):
+            with suppress(FileNotFoundError):
                 os.remove(file_path)
-            db.session.delete(orphaned_file)
+            deleted_ids.append(orphaned_file.id)
             results['deleted'].append(orphaned_file.file_path)
         except PermissionError:
             results['errors'].append({'path': orphaned_file.file_path, 'error': 'Permission denied'})
@@ -390,14 +533,14 @@ def delete_orphaned_folder():
         try:
             # Get the common directory from the first deleted file
             first_deleted = results['deleted'][0]
-            instance = Instance.query.get(data.get('instance_id'))
+            instance = db.session.get(Instance, data.get('instance_id'))
             if instance and instance.qbt_download_dir and instance.mapped_download_dir:
                 dir_path = data.get('directory', '')
                 if dir_path.startswith(instance.qbt_download_dir):
-                    local_dir = dir_path.replace(instance.qbt_download_dir, instance.mapped_download_dir, 1)
+                    local_dir = instance.mapped_download_dir + dir_path[len(instance.qbt_download_dir):]
                     # Try to remove empty directories up to the mapped root
                     while local_dir != instance.mapped_download_dir and local_dir != '/':
-                        if os.path.isdir(local_dir) and not os.listdir(local_dir):
+                        if os.path.isdir(local_dir) and _is_dir_empty(local_dir):
                             os.rmdir(local_dir)
                             local_dir = os.path.dirname(local_dir)
                         else:
@@ -405,6 +548,8 @@ def delete_orphaned_folder():
         except Exception:
             pass  # Ignore errors when cleaning up empty directories
     
+    if deleted_ids:
+        OrphanedFile.query.filter(OrphanedFile.id.in_(deleted_ids)).delete(synchronize_session=False)
     db.session.commit()
     
     if results['errors']:
@@ -423,7 +568,7 @@ def delete_orphaned_folder():
 
 @app.route('/orphaned-files/settings/<instance_id>', methods=['POST'])
 def update_orphaned_settings(instance_id):
-    instance = Instance.query.get_or_404(instance_id)
+    instance = db.get_or_404(Instance, instance_id)
     instance.orphaned_scan_enabled = request.form.get('orphaned_scan_enabled') == 'on'
     instance.orphaned_min_age_days = int(request.form.get('orphaned_min_age_days') or 7)
     raw_patterns = request.form.get('orphaned_ignore_patterns', '')
@@ -437,11 +582,11 @@ def clear_orphaned_files():
     instance_id = request.form.get('instance_id')
     try:
         if instance_id:
-            num_rows_deleted = db.session.query(OrphanedFile).filter_by(instance_id=instance_id).delete()
-            instance = Instance.query.get(instance_id)
+            num_rows_deleted = db.session.query(OrphanedFile).filter_by(instance_id=instance_id).delete(synchronize_session=False)
+            instance = db.session.get(Instance, instance_id)
             flash(f'Successfully cleared {num_rows_deleted} orphaned files for {instance.name}.', 'success')
         else:
-            num_rows_deleted = db.session.query(OrphanedFile).delete()
+            num_rows_deleted = db.session.query(OrphanedFile).delete(synchronize_session=False)
             flash(f'Successfully cleared {num_rows_deleted} orphaned files.', 'success')
         db.session.commit()
     except Exception as e:
@@ -451,7 +596,7 @@ def clear_orphaned_files():
 
 @app.route('/orphaned-files/delete/<int:file_id>', methods=['POST'])
 def delete_orphaned_file(file_id):
-    orphaned_file = OrphanedFile.query.get_or_404(file_id)
+    orphaned_file = db.get_or_404(OrphanedFile, file_id)
     try:
         db.session.delete(orphaned_file)
         db.session.commit()
@@ -510,23 +655,14 @@ def instances():
         return redirect(url_for('instances'))
     
     instances = Instance.query.all()
-    instance_statuses = {}
-    for instance in instances:
-        client = get_client(instance)
-        if client:
-            try:
-                version = client.app_version()
-                instance_statuses[instance.id] = {'status': 'Online', 'version': version}
-            except Exception as e:
-                instance_statuses[instance.id] = {'status': 'Offline', 'error': f'An unexpected error occurred: {e}'}
-        else:
-            instance_statuses[instance.id] = {'status': 'Offline', 'error': 'Could not connect. Check logs for details.'}
+    instance_statuses = get_instance_statuses(instances)
             
     return render_template('instances.html', configs=instances, instance_statuses=instance_statuses)
 
 @app.route('/instances/edit/<instance_id>', methods=['GET', 'POST'])
 def edit_instance(instance_id):
-    instance = Instance.query.get_or_404(instance_id)
+    # The edit form never shows rules; raise instead of silently loading them
+    instance = db.get_or_404(Instance, instance_id, options=[raiseload(Instance.rules)])
 
     if request.method == 'POST':
         tag_nohardlinks = request.form.get('tag_nohardlinks') == 'true'
@@ -557,7 +693,7 @@ def edit_instance(instance_id):
 
 @app.route('/instances/delete/<instance_id>', methods=['POST'])
 def delete_instance(instance_id):
-    instance = Instance.query.get(instance_id)
+    instance = db.session.get(Instance, instance_id)
     if instance:
         db.session.delete(instance)
         db.session.commit()
@@ -570,27 +706,76 @@ def delete_instance(instance_id):
 CACHE_FILE = os.path.join(DATA_DIR, 'cache.json')
 CACHE_DURATION = 1200  # 20 minutes
 
+# Parsed cache file, reused until the file's mtime changes
+_RULE_OPTIONS_CACHE = {'mtime': None, 'data': None}
+
+def _load_cache_file():
+    try:
+        mtime = os.stat(CACHE_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if mtime == _RULE_OPTIONS_CACHE['mtime']:
+        return _RULE_OPTIONS_CACHE['data']
+
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+    _RULE_OPTIONS_CACHE.update(mtime=mtime, data=cache)
+    return cache
+
 def read_cache():
     settings = load_settings()
     cache_duration_seconds = settings.get('cache_duration_minutes', 10) * 60
-    try:
-        with open(CACHE_FILE, 'r') as f:
-            cache = json.load(f)
-            now = time.time()
-            if now - cache.get('timestamp', 0) < cache_duration_seconds:
-                return cache.get('data')
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
+    cache = _load_cache_file()
+    if cache and time.time() - cache.get('timestamp', 0) < cache_duration_seconds:
+        return cache.get('data')
     return None
 
 def write_cache(data):
-    with open(CACHE_FILE, 'w') as f:
-        json.dump({'data': data, 'timestamp': time.time()}, f)
+    # Write to a temp file and swap it in so readers never see a partial file.
+    # Each writer gets its own temp file, so concurrent cache misses cannot clobber each other.
+    fd, tmp_file = tempfile.mkstemp(dir=DATA_DIR, prefix='cache.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps({'data': data, 'timestamp': time.time()}))
+        os.replace(tmp_file, CACHE_FILE)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_file)
+        raise
 
 def clear_cache():
     if os.path.exists(CACHE_FILE):
         os.remove(CACHE_FILE)
 
+# Extracts the netloc of a tracker URL without building a full urlparse() result
+_NETLOC_RE = re.compile(r'^\w[\w+\-.]*://([^/?#]+)')
+
+def _fetch_rule_options(instance):
+    """Collect the tags and tracker hosts used by a single instance."""
+    tags = set()
+    trackers = set()
+    client = get_client(instance)
+    if client:
+        try:
+            for tag in client.torrents_tags() or []:
+                if tag:
+                    tags.add(tag)
+
+            for torrent in iter_all_torrents(client):
+                for tracker in torrent.trackers:
+                    match = _NETLOC_RE.match(tracker.url)
+                    if match:
+                        trackers.add(match.group(1))
+        except Exception as e:
+            # Log error instead of flashing in an API context
+            print(f"An error occurred while fetching data from '{instance.name}': {e}")
+    return tags, trackers
+
 @app.route('/api/rule-options')
 def get_rule_options():
     cached_data = read_cache()
@@ -605,25 +790,10 @@ def get_rule_options():
         all_trackers.add('N/A')
         all_tags.add('N/A')
     else:
-        for instance in instances:
-            client = get_client(instance)
-            if client:
-                try:
-                    tags = client.torrents_tags()
-                    if tags:
-                        for tag in tags:
-                            if tag:
-                                all_tags.add(tag)
-
-                    torrents = get_all_torrents(client)
-                    for torrent in torrents:
-                        for tracker in torrent.trackers:
-                            parsed_url = urlparse(tracker.url)
-                            if parsed_url.netloc:
-                                all_trackers.add(parsed_url.netloc)
-                except Exception as e:
-                    # Log error instead of flashing in an API context
-                    print(f"An error occurred while fetching data from '{instance.name}': {e}")
+        with ThreadPoolExecutor(max_workers=min(8, len(instances))) as executor:
+            for tags, trackers in executor.map(_fetch_rule_options, instances):
+                all_tags |= tags
+                all_trackers |= trackers
 
     if not all_trackers:
         all_trackers.add('N/A')
@@ -631,8 +801,8 @@ def get_rule_options():
         all_tags.add('N/A')
 
     fetched_data = {
-        'trackers': sorted(list(all_trackers)),
-        'tags': sorted(list(all_tags))
+        'trackers': sorted(all_trackers),
+        'tags': sorted(all_tags)
     }
     
     write_cache(fetched_data)
@@ -661,13 +831,13 @@ def rules():
         flash(f"Rule '{new_rule.name}' saved successfully!", 'success')
         return redirect(url_for('rules'))
     
-    rules = Rule.query.all()
+    rules = all_rules()
     instances = Instance.query.all()
     return render_template('rules.html', rules=rules, instances=instances)
 
 @app.route('/rules/edit/<rule_id>', methods=['GET', 'POST'])
 def edit_rule(rule_id):
-    rule = Rule.query.get_or_404(rule_id)
+    rule = db.get_or_404(Rule, rule_id)
 
     if request.method == 'POST':
         rule.name = request.form['name']
@@ -685,7 +855,7 @@ def edit_rule(rule_id):
 
 @app.route('/rules/delete/<rule_id>', methods=['POST'])
 def delete_rule(rule_id):
-    rule = Rule.query.get(rule_id)
+    rule = db.session.get(Rule, rule_id)
     if rule:
         db.session.delete(rule)
         db.session.commit()
@@ -733,30 +903,62 @@ def test_discord():
 
 @app.route('/admin/restart', methods=['POST'])
 def restart():
-    """Restarts the application by touching the main app file to trigger the reloader."""
+    """
+    Restarts the application. The process exits and relies on its supervisor
+    (Docker's restart policy, systemd, ...) to start it again; the reloader is
+    disabled in production, so touching the source file did nothing. Set
+    RESTART_VIA_SIGHUP=1 to signal the parent process instead.
+    """
     try:
-        file_path = __file__
-        with open(file_path, 'a'):
-            os.utime(file_path, None)
+        if os.environ.get('RESTART_VIA_SIGHUP') == '1':
+            os.kill(os.getppid(), signal.SIGHUP)
+        else:
+            # Delay the exit so the redirect response is flushed first
+            threading.Timer(0.5, os._exit, args=(3,)).start()
         flash('Application is restarting...', 'success')
     except Exception as e:
         flash(f'Error restarting application: {e}', 'danger')
     return redirect(url_for('settings'))
 
+SCHEDULER_LOCK_FILE = os.path.join(DATA_DIR, 'scheduler.lock')
+
+def acquire_scheduler_lock():
+    """
+    Takes an exclusive lock on SCHEDULER_LOCK_FILE so only one process sharing the
+    data directory runs background jobs. The handle is returned and must stay open
+    for the lifetime of the process; None means another process holds the lock.
+    """
+    lock_file = open(SCHEDULER_LOCK_FILE, 'w')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
     
     settings = load_settings()
-    from scheduler import run_all_jobs
-    scheduler = BackgroundScheduler()
+    scheduler_lock = acquire_scheduler_lock()
+    if scheduler_lock:
+        from scheduler import run_all_jobs
+        # One worker is enough for the single job; it also parallelizes per instance internally
+        scheduler = BackgroundScheduler(executors={'default': JobExecutor(max_workers=1)})
 
-    interval_minutes = settings.get('scheduler_interval_minutes', 10)
-    
-    # Single unified job that fetches torrents once and runs all tasks
-    scheduler.add_job(func=run_all_jobs, trigger="interval", minutes=interval_minutes, next_run_time=datetime.now())
-    
-    scheduler.start()
+        interval_minutes = settings.get('scheduler_interval_minutes', 10)
+        
+        # Single unified job that fetches torrents once and runs all tasks.
+        # A slow cycle is never overlapped by the next one; missed runs collapse into one.
+        scheduler.add_job(func=run_all_jobs, trigger="interval", minutes=interval_minutes, next_run_time=datetime.now(),
+                          max_instances=1, coalesce=True)
+        
+        scheduler.start()
+    else:
+        print("Another qPanel process holds the scheduler lock; background jobs are disabled in this process.")
 
     port = int(os.environ.get("FLASK_PORT", 5001))
     app.run(debug=True, use_reloader=False, host='0.0.0.0', port=port)
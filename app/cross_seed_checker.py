@@ -1,14 +1,17 @@
 import logging
-from app import db, Instance, TelegramMessage, ActionLog, load_settings
-from notifications import send_notification
-from qbt_client import get_client, get_all_torrents
+from app import db, ActionLog, writing
+from notifications import queue_notifications
+from qbt_client import iter_all_torrents
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 logger = logging.getLogger(__name__)
 
+# qBittorrent 5 renamed the paused states to "stopped"; both mean the torrent is not running.
+_PAUSED_STATES = frozenset({'pausedUP', 'pausedDL', 'stoppedUP', 'stoppedDL'})
 
-def pause_cross_seeded_torrents_for_instance(instance, client, torrents=None):
+
+def pause_cross_seeded_torrents_for_instance(instance, client, settings, torrents=None):
     """
     Checks for and pauses cross-seeded torrents on a single qBittorrent instance.
     A torrent is considered a duplicate if it has the same name as another torrent
@@ -17,58 +20,68 @@ def pause_cross_seeded_torrents_for_instance(instance, client, torrents=None):
     Args:
         instance: The Instance object
         client: The qBittorrent client
+        settings: Settings loaded once by the calling job
         torrents: Optional pre-fetched torrent list (for memory optimization)
     """
-    settings = load_settings()
     try:
-        # Use pre-fetched torrents if provided, otherwise fetch them
+        # Use pre-fetched torrents if provided, otherwise stream them page by page
         if torrents is None:
-            torrents = get_all_torrents(client)
-        # Get names of all torrents that are in any paused state.
-        paused_torrent_names = {t.name for t in torrents if 'paused' in t.state.lower()}
-
+            torrents = iter_all_torrents(client)
+        # Single pass: remember paused names and keep the running torrents aside.
+        paused_names = set()
+        active = []
         for torrent in torrents:
-            # If a torrent has the same name as a paused one, and is not itself paused, pause it.
-            if torrent.name in paused_torrent_names and 'paused' not in torrent.state.lower():
-                client.torrents_pause(torrent_hashes=torrent.hash)
+            if torrent.state in _PAUSED_STATES:
+                paused_names.add(torrent.name)
+            else:
+                active.append(torrent)
+
+        # If a torrent has the same name as a paused one, and is not itself paused, pause it.
+        to_pause = [torrent for torrent in active if torrent.name in paused_names]
 
-                # Get tracker and format message first
-                http_tracker = next((t.url for t in torrent.trackers if t.url.startswith('http')), 'N/A')
-                message_text = f"Paused cross-seeded torrent on {instance.name}: {torrent.name} ({http_tracker})"
-                
-                # Now log, create db entries, and notify
-                logging.info(message_text)
-                
-                action = ActionLog(
-                    instance_id=instance.id,
-                    action="Paused cross-seeded torrent",
-                    details=f"{torrent.name} ({http_tracker})"
-                )
-                db.session.add(action)
-                
-                if send_notification(message_text, settings, parse_mode='HTML'):
-                    new_message = TelegramMessage(message=message_text)
-                    db.session.add(new_message)
+        if not to_pause:
+            return
 
-        db.session.commit()
+        # A single round trip pauses every cross-seed on the instance
+        client.torrents_pause(torrent_hashes='|'.join(t.hash for t in to_pause))
+
+        actions = []
+        notify_lines = []
+        for torrent in to_pause:
+            # The bulk torrents_info fetch carries no trackers; ask for them only for torrents being paused
+            trackers = client.torrents_trackers(torrent_hash=torrent.hash)
+            http_tracker = next((t.url for t in trackers if t.url.startswith('http')), 'N/A')
+            message_text = f"Paused cross-seeded torrent on {instance.name}: {torrent.name} ({http_tracker})"
+            
+            # Now log, create db entries, and notify
+            logging.info(message_text)
+            
+            actions.append({
+                'instance_id': instance.id,
+                'action': "Paused cross-seeded torrent",
+                'details': f"{torrent.name} ({http_tracker})"
+            })
+            
+            notify_lines.append(message_text)
+
+        # Plain mappings skip ORM object construction; column defaults fill in timestamps.
+        # The INSERT is sent immediately, so it runs under the write lock together with the commit.
+        with writing():
+            db.session.bulk_insert_mappings(ActionLog, actions)
+            db.session.commit()
+
+        # Delivered in the background so the tick does not wait on Telegram
+        queue_notifications(notify_lines, settings, parse_mode='HTML')
     except Exception as e:
         logging.error(f"Error checking for cross-seeded torrents on {instance.name}: {e}")
+        db.session.rollback()
 
 
 def pause_cross_seeded_torrents_job():
     """
-    Scheduled job to check for and pause cross-seeded torrents across all instances.
+    Legacy: Scheduled job to check for and pause cross-seeded torrents across all instances.
+    Delegates to the unified scheduler cycle so torrents are fetched once per instance
+    and shared with the other tasks.
     """
-    from app import app
-    with app.app_context():
-        instances = Instance.query.filter_by(pause_cross_seeded_torrents=True).all()
-        for instance in instances:
-            client = get_client(instance)
-            if client:
-                try:
-                    client.auth_log_in()
-                    pause_cross_seeded_torrents_for_instance(instance, client)
-                except Exception as e:
-                    logging.error(f"Failed to process instance {instance.name} for cross-seeded torrents: {e}")
-            else:
-                logging.warning(f"Could not connect to instance {instance.name} to check for cross-seeded torrents.")
+    from scheduler import run_all_jobs
+    run_all_jobs()
@@ -0,0 +1,48 @@
+"""Add timestamp indexes for action log and orphaned files
+
+Revision ID: 5d2e9a41c7f3
+Revises: c3a1f8e92b47
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e9a41c7f3'
+down_revision = 'c3a1f8e92b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'action_log' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('action_log')]
+        if 'ix_actionlog_ts_desc' not in existing_indexes:
+            op.create_index('ix_actionlog_ts_desc', 'action_log', [sa.text('timestamp DESC')])
+
+    if 'orphaned_file' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('orphaned_file')]
+        if 'ix_orphan_instance_ts' not in existing_indexes:
+            op.create_index('ix_orphan_instance_ts', 'orphaned_file', ['instance_id', sa.text('timestamp DESC')])
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'orphaned_file' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('orphaned_file')]
+        if 'ix_orphan_instance_ts' in existing_indexes:
+            op.drop_index('ix_orphan_instance_ts', table_name='orphaned_file')
+
+    if 'action_log' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('action_log')]
+        if 'ix_actionlog_ts_desc' in existing_indexes:
+            op.drop_index('ix_actionlog_ts_desc', table_name='action_log')
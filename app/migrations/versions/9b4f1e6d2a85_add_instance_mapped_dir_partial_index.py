@@ -0,0 +1,39 @@
+"""Add partial index on instance mapped download dir
+
+Revision ID: 9b4f1e6d2a85
+Revises: 5d2e9a41c7f3
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4f1e6d2a85'
+down_revision = '5d2e9a41c7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'instance' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('instance')]
+        if 'ix_instance_mapped_dl_nn' not in existing_indexes:
+            op.create_index('ix_instance_mapped_dl_nn', 'instance', ['mapped_download_dir'],
+                            sqlite_where=sa.text('mapped_download_dir IS NOT NULL'))
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'instance' in existing_tables:
+        existing_indexes = [ix['name'] for ix in inspector.get_indexes('instance')]
+        if 'ix_instance_mapped_dl_nn' in existing_indexes:
+            op.drop_index('ix_instance_mapped_dl_nn', table_name='instance')
@@ -3,11 +3,28 @@ Notification utilities for qPanel.
 Handles sending notifications to Telegram and Discord.
 """
 
+import html
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import queue
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Shared session so bursts of notifications reuse keep-alive TLS connections.
+# urllib3 does not retry POSTs once the request was sent, so only connection
+# failures are retried and a message is never delivered twice.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.2))
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+DISCORD_MAX_MESSAGE_LENGTH = 2000
+
 
 def send_telegram_message(bot_token, chat_id, message, parse_mode=None):
     """
@@ -27,7 +44,7 @@ def send_telegram_message(bot_token, chat_id, message, parse_mode=None):
         payload['parse_mode'] = parse_mode
         
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _session.post(url, json=payload, timeout=10)
         response.raise_for_status()
         logger.info("Successfully sent Telegram message.")
         return True
@@ -49,7 +66,7 @@ def send_discord_message(webhook_url, message):
     }
         
     try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = _session.post(webhook_url, json=payload, timeout=10)
         response.raise_for_status()
         logger.info("Successfully sent Discord message.")
         return True
@@ -87,3 +104,129 @@ def send_notification(message, settings=None, parse_mode=None):
     return success
 
 
+
+
+def chunk_lines(lines, limit=TELEGRAM_MAX_MESSAGE_LENGTH):
+    """
+    Joins lines with newlines into as few messages as possible, each at most `limit` characters.
+    A single line longer than the limit is split across messages.
+    """
+    chunks = []
+    current = ''
+    for line in lines:
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if not current:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current = f"{current}\n{line}"
+        else:
+            chunks.append(current)
+            current = line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def send_combined_notification(lines, settings=None, parse_mode=None):
+    """
+    Sends a batch of notification lines as few combined messages as possible.
+    Each enabled channel is chunked to its own message length limit.
+    Returns the list of messages that were sent successfully (Telegram's if it
+    delivered anything, otherwise Discord's).
+    """
+    if settings is None:
+        from app import load_settings
+        settings = load_settings()
+
+    telegram_sent = []
+    if settings.get('telegram_notification_enabled'):
+        # Lines are plain text; escape them so one torrent name containing '<' or '&'
+        # cannot make Telegram reject the whole combined HTML message
+        telegram_lines = [html.escape(line, quote=False) for line in lines] if parse_mode == 'HTML' else lines
+        for message in chunk_lines(telegram_lines, TELEGRAM_MAX_MESSAGE_LENGTH):
+            if send_telegram_message(
+                settings.get('telegram_bot_token'),
+                settings.get('telegram_chat_id'),
+                message,
+                parse_mode=parse_mode
+            ):
+                telegram_sent.append(message)
+
+    discord_sent = []
+    if settings.get('discord_notification_enabled'):
+        for message in chunk_lines(lines, DISCORD_MAX_MESSAGE_LENGTH):
+            if send_discord_message(settings.get('discord_webhook_url'), message):
+                discord_sent.append(message)
+
+    sent = telegram_sent or discord_sent
+    if sent:
+        logger.info(f"Sent {len(lines)} notification event(s) in {len(sent)} message(s).")
+    return sent
+
+
+# Background delivery: jobs hand their lines to a queue and continue; a single worker
+# coalesces what arrives within a short window, sends it and records the sent messages.
+NOTIFICATION_BATCH_WINDOW = 5  # seconds
+NOTIFICATION_BATCH_MAX_ITEMS = 20
+_notification_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def queue_notifications(lines, settings=None, parse_mode=None):
+    """Queues notification lines for background delivery; returns immediately."""
+    global _worker
+    if not lines:
+        return
+    _notification_queue.put((list(lines), settings, parse_mode))
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_notification_worker, name='notification-worker', daemon=True)
+            _worker.start()
+
+
+def _notification_worker():
+    while True:
+        batch = [_notification_queue.get()]
+        deadline = time.monotonic() + NOTIFICATION_BATCH_WINDOW
+        while len(batch) < NOTIFICATION_BATCH_MAX_ITEMS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_notification_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _deliver_batch(batch)
+        except Exception as e:
+            logger.error(f"Failed to deliver queued notifications: {e}")
+        finally:
+            for _ in batch:
+                _notification_queue.task_done()
+
+
+def _deliver_batch(batch):
+    """Sends queued items grouped by parse mode, using the most recent settings, and stores what was sent."""
+    from app import app, db, TelegramMessage, writing
+
+    grouped = {}
+    for lines, settings, parse_mode in batch:
+        group = grouped.setdefault(parse_mode, {'lines': [], 'settings': None})
+        group['lines'].extend(lines)
+        group['settings'] = settings
+
+    sent = []
+    for parse_mode, group in grouped.items():
+        sent.extend(send_combined_notification(group['lines'], group['settings'], parse_mode=parse_mode))
+
+    if sent:
+        with app.app_context():
+            db.session.add_all([TelegramMessage(message=message) for message in sent])
+            with writing():
+                db.session.commit()
@@ -1,31 +1,104 @@
 import qbittorrentapi
 from urllib.parse import urlparse
 import logging
+import threading
+import time
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
-def get_client(instance):
-    """Creates and returns a qBittorrent client instance."""
-    parsed_url = urlparse(instance.host)
-    
-    host = parsed_url.hostname
-    port = parsed_url.port
+# Authenticated clients are reused across requests and scheduler runs.
+# qbittorrentapi transparently logs in again if the session cookie expires.
+CLIENT_TTL = 300  # seconds
+# (connect, read) timeouts so an unreachable instance cannot stall a scheduler tick
+REQUESTS_ARGS = {'timeout': (3.05, 30)}
+_client_pool = {}
+_client_pool_lock = threading.Lock()
+
+@lru_cache(maxsize=64)
+def _parse_host(host):
+    """Normalizes a stored host string to 'scheme://hostname:port'."""
+    parsed_url = urlparse(host)
     
     # Prepend scheme if it's missing, default to http
     scheme = parsed_url.scheme or 'http'
-    full_host_url = f"{scheme}://{host}:{port}"
+    return f"{scheme}://{parsed_url.hostname}:{parsed_url.port}"
 
+def _create_client(instance):
+    """Creates and returns a qBittorrent client instance."""
     try:
-        client = qbittorrentapi.Client(
-            host=full_host_url,
-            username=instance.username,
-            password=instance.password
-        )
-        return client
-    except Exception as e:
-        print(f"Failed to create qBittorrent client for {instance.name}: {e}")
+        full_host_url = _parse_host(instance.host)
+    except ValueError:
+        # urlparse raises on malformed ports; Client() itself does no I/O and does not fail here
+        logger.exception("Failed to create qBittorrent client for %s", instance.name)
         return None
 
+    return qbittorrentapi.Client(
+        host=full_host_url,
+        username=instance.username,
+        password=instance.password,
+        REQUESTS_ARGS=REQUESTS_ARGS
+    )
+
+def get_client(instance):
+    """Returns a pooled qBittorrent client for the instance, creating one if needed."""
+    key = (instance.id, instance.host, instance.username, instance.password)
+    now = time.monotonic()
+    with _client_pool_lock:
+        entry = _client_pool.get(key)
+        if entry and entry[1] > now:
+            return entry[0]
+
+    client = _create_client(instance)
+    if client:
+        with _client_pool_lock:
+            # Drop clients built from this instance's previous host/credentials
+            for stale_key in [k for k in _client_pool if k[0] == instance.id]:
+                del _client_pool[stale_key]
+            _client_pool[key] = (client, now + CLIENT_TTL)
+    return client
+
+def evict_client(instance):
+    """Drops the pooled client for an instance so the next get_client() builds a fresh one."""
+    with _client_pool_lock:
+        for stale_key in [k for k in _client_pool if k[0] == instance.id]:
+            del _client_pool[stale_key]
+
+def iter_all_torrents(client, **kwargs):
+    """
+    Yields ALL torrents from qBittorrent one page at a time.
+    
+    Only a single page of up to 1000 torrents is held at once, so callers that
+    make a single pass over the torrents avoid materializing the whole list.
+    
+    Args:
+        client: qBittorrent client instance
+        **kwargs: Additional arguments to pass to torrents_info()
+    """
+    limit = 1000  # Retrieve 1000 torrents at a time
+    offset = 0
+    total = 0
+    
+    while True:
+        # Fetch batch of torrents with pagination
+        batch = client.torrents_info(limit=limit, offset=offset, **kwargs)
+        
+        if not batch:
+            # No more torrents to fetch
+            break
+        
+        total += len(batch)
+        logger.debug(f"Retrieved {len(batch)} torrents (offset: {offset}, total so far: {total})")
+        yield from batch
+        
+        # If we got fewer torrents than the limit, we've reached the end
+        if len(batch) < limit:
+            break
+        
+        offset += limit
+    
+    logger.info(f"Retrieved total of {total} torrents")
+
 def get_all_torrents(client, **kwargs):
     """
     Retrieves ALL torrents from qBittorrent with proper pagination handling.
@@ -41,29 +114,7 @@ def get_all_torrents(client, **kwargs):
         List of all torrents
     """
     try:
-        all_torrents = []
-        limit = 1000  # Retrieve 1000 torrents at a time
-        offset = 0
-        
-        while True:
-            # Fetch batch of torrents with pagination
-            batch = client.torrents_info(limit=limit, offset=offset, **kwargs)
-            
-            if not batch:
-                # No more torrents to fetch
-                break
-            
-            all_torrents.extend(batch)
-            logger.debug(f"Retrieved {len(batch)} torrents (offset: {offset}, total so far: {len(all_torrents)})")
-            
-            # If we got fewer torrents than the limit, we've reached the end
-            if len(batch) < limit:
-                break
-            
-            offset += limit
-        
-        logger.info(f"Retrieved total of {len(all_torrents)} torrents")
-        return all_torrents
+        return list(iter_all_torrents(client, **kwargs))
     except Exception as e:
         logger.error(f"Error retrieving torrents with pagination: {e}")
         # Fallback to non-paginated call
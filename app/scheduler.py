@@ -1,115 +1,153 @@
-from app import app, db, Instance, ActionLog, OrphanedFile
+from app import app, db, Instance, ActionLog, OrphanedFile, writing
 from qbt_client import get_client, get_all_torrents
 from flask import flash
 import logging
 import traceback
 from app import load_settings
 import os
-from notifications import send_notification
-from app import TelegramMessage
-from datetime import datetime, timedelta
+from notifications import queue_notifications
+from datetime import datetime
 from typing import Optional, Set, List, Tuple, Dict, Any
 import re
 import gc
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _fetch_instance_torrents(instance):
+    """Returns (client, torrents) for an instance, or (None, None) if it is unreachable."""
+    client = get_client(instance)
+    if not client:
+        return None, None
+    return client, get_all_torrents(client)
+
+def _process_instance(instance_id, client, torrents, files_cache, settings):
+    """
+    Runs the per-instance tasks (unregistered, noHL, rules, cross-seed) on pre-fetched torrents.
+    Called from a worker thread, so it pushes its own app context and works in its own session.
+    Callers must not run two of these at once for the same client: its file fetches use up to
+    TORRENT_FILES_WORKERS of the client's connections (see _process_instance_group).
+    """
+    from cross_seed_checker import pause_cross_seeded_torrents_for_instance
+
+    with app.app_context():
+        try:
+            instance = db.session.get(Instance, instance_id)
+        except Exception as e:
+            logger.error(f"Error loading instance {instance_id} for processing: {e}")
+            db.session.rollback()
+            return
+        if instance is None:
+            return
+
+        # Phase 2: Run tag_unregistered_torrents
+        if instance.tag_unregistered_torrents:
+            try:
+                tag_unregistered_torrents_for_instance(instance, client, torrents, settings)
+            except Exception as e:
+                logger.error(f"Error in tag_unregistered_torrents for '{instance.name}': {e}")
+                db.session.rollback()
+
+        # Phase 3: Run tag_torrents_with_no_hard_links
+        if instance.tag_nohardlinks:
+            try:
+                tag_torrents_with_no_hard_links(instance, client, torrents, files_cache)
+            except Exception as e:
+                logger.error(f"Error in tag_torrents_with_no_hard_links for '{instance.name}': {e}")
+                db.session.rollback()
+
+        # Phase 4: Apply rules
+        try:
+            apply_rules_for_instance(instance, client, torrents)
+        except Exception as e:
+            logger.error(f"Error in apply_rules for '{instance.name}': {e}")
+            db.session.rollback()
+
+        # Phase 5: Pause cross-seeded torrents
+        if instance.pause_cross_seeded_torrents:
+            try:
+                pause_cross_seeded_torrents_for_instance(instance, client, settings, torrents)
+            except Exception as e:
+                logger.error(f"Error in pause_cross_seeded_torrents for '{instance.name}': {e}")
+
+def _process_instance_group(members, settings):
+    """Runs _process_instance for instances sharing one client, sequentially; failures are isolated per instance."""
+    for instance_id, cache in members:
+        try:
+            _process_instance(instance_id, cache['client'], cache['torrents'], cache['files'], settings)
+        except Exception as e:
+            logger.error(f"Error processing instance '{cache['instance'].name}': {e}")
+
 def run_all_jobs():
     """
     Unified scheduler job that fetches torrents ONCE per instance and runs all tasks.
     This significantly reduces memory usage by avoiding redundant API calls.
     """
-    from cross_seed_checker import pause_cross_seeded_torrents_for_instance
-    
     with app.app_context():
         logger.info("=== Starting unified scheduler cycle ===")
         
         all_instances = Instance.query.all()
+        settings = load_settings()
         
         # Cache for torrent data: {instance_id: {'client': client, 'torrents': torrents}}
         instance_cache: Dict[int, Dict[str, Any]] = {}
         
         # Phase 1: Fetch all torrent data once per instance
+        # Fetching is pure network I/O, so instances are queried concurrently;
+        # everything touching the database below stays on this thread.
         logger.info("Phase 1: Fetching torrent data from all instances...")
-        for instance in all_instances:
-            try:
-                client = get_client(instance)
-                if client:
-                    torrents = get_all_torrents(client)
-                    instance_cache[instance.id] = {
-                        'client': client,
-                        'torrents': torrents,
-                        'instance': instance
-                    }
-                    logger.info(f"Fetched {len(torrents)} torrents from '{instance.name}'")
-                else:
-                    logger.warning(f"Could not connect to instance '{instance.name}'")
-            except Exception as e:
-                logger.error(f"Error fetching torrents from '{instance.name}': {e}")
-        
-        # Phase 2: Run tag_unregistered_torrents
-        logger.info("Phase 2: Checking for unregistered torrents...")
-        for instance in Instance.query.filter_by(tag_unregistered_torrents=True).all():
-            if instance.id in instance_cache:
-                try:
-                    cache = instance_cache[instance.id]
-                    tag_unregistered_torrents_for_instance(
-                        cache['instance'], 
-                        cache['client'], 
-                        cache['torrents']
-                    )
-                    db.session.commit()
-                except Exception as e:
-                    logger.error(f"Error in tag_unregistered_torrents for '{instance.name}': {e}")
-                    db.session.rollback()
-        
-        # Phase 3: Run tag_torrents_with_no_hard_links
-        logger.info("Phase 3: Checking for torrents with no hard links...")
-        for instance in Instance.query.filter_by(tag_nohardlinks=True).all():
-            if instance.id in instance_cache:
-                try:
-                    cache = instance_cache[instance.id]
-                    tag_torrents_with_no_hard_links(
-                        cache['instance'], 
-                        cache['client'], 
-                        cache['torrents']
-                    )
-                    db.session.commit()
-                except Exception as e:
-                    logger.error(f"Error in tag_torrents_with_no_hard_links for '{instance.name}': {e}")
-                    db.session.rollback()
-        
-        # Phase 4: Apply rules
-        logger.info("Phase 4: Applying rules...")
-        for instance in all_instances:
-            if instance.id in instance_cache:
-                try:
-                    cache = instance_cache[instance.id]
-                    apply_rules_for_instance(
-                        cache['instance'], 
-                        cache['client'], 
-                        cache['torrents']
-                    )
-                    db.session.commit()
-                except Exception as e:
-                    logger.error(f"Error in apply_rules for '{instance.name}': {e}")
-                    db.session.rollback()
+        if all_instances:
+            # Instances pointing at the same qBittorrent login (e.g. several profiles over one
+            # client) share a single fetch and file cache for this cycle.
+            fetches = {}
+            files_caches = {}
+            with ThreadPoolExecutor(max_workers=min(8, len(all_instances))) as executor:
+                futures = []
+                for instance in all_instances:
+                    key = (instance.host, instance.username)
+                    if key not in fetches:
+                        fetches[key] = executor.submit(_fetch_instance_torrents, instance)
+                        # torrent hash -> file list, shared by the noHL and orphan phases
+                        files_caches[key] = {}
+                    futures.append((instance, key))
+                for instance, key in futures:
+                    try:
+                        client, torrents = fetches[key].result()
+                        if client:
+                            instance_cache[instance.id] = {
+                                'client': client,
+                                'torrents': torrents,
+                                'instance': instance,
+                                'files': files_caches[key],
+                                # instances sharing a login share the client; see Phases 2-5
+                                'fetch_key': key
+                            }
+                            logger.info(f"Fetched {len(torrents)} torrents from '{instance.name}'")
+                        else:
+                            logger.warning(f"Could not connect to instance '{instance.name}'")
+                    except Exception as e:
+                        logger.error(f"Error fetching torrents from '{instance.name}': {e}")
         
-        # Phase 5: Pause cross-seeded torrents
-        logger.info("Phase 5: Checking for cross-seeded torrents...")
-        for instance in Instance.query.filter_by(pause_cross_seeded_torrents=True).all():
-            if instance.id in instance_cache:
-                try:
-                    cache = instance_cache[instance.id]
-                    pause_cross_seeded_torrents_for_instance(
-                        cache['instance'], 
-                        cache['client'],
-                        cache['torrents']
-                    )
-                except Exception as e:
-                    logger.error(f"Error in pause_cross_seeded_torrents for '{instance.name}': {e}")
+        # Phases 2-5 only talk to their own instance, so instances are processed concurrently;
+        # the phases for a single instance still run in order, and at most one task uses a
+        # pooled client at a time.
+        logger.info("Phases 2-5: Processing instances...")
+        if instance_cache:
+            # Instances sharing a fetched client are handled one after another in a single task
+            groups = defaultdict(list)
+            for instance_id, cache in instance_cache.items():
+                groups[cache['fetch_key']].append((instance_id, cache))
+            with ThreadPoolExecutor(max_workers=min(8, len(groups))) as executor:
+                futures = [executor.submit(_process_instance_group, members, settings) for members in groups.values()]
+                for future in futures:
+                    # One group failing must not stop the others or Phase 6
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"Error processing instances: {error}")
         
         # Phase 6: Detect orphaned files (uses cached torrent data)
         logger.info("Phase 6: Detecting orphaned files...")
@@ -127,6 +165,37 @@ def run_all_jobs():
         logger.info("=== Unified scheduler cycle complete ===")
 
 
+@lru_cache(maxsize=1024)
+def _rule_matcher(condition_type: str, condition_value: str) -> Tuple[Tuple[str, ...], Optional[re.Pattern]]:
+    """Parses a rule condition into (values, tracker pattern), once per distinct condition.
+
+    Values are comma-separated for multi-select. Only tracker rules get a pattern: an escaped
+    alternation of the values, so each tracker URL is scanned once. Editing a rule changes the
+    key, so stale entries are simply never hit again.
+    """
+    rule_values = tuple(v.strip() for v in condition_value.split(',') if v.strip())
+    values_re = None
+    if condition_type == 'tracker' and rule_values:
+        values_re = re.compile('|'.join(map(re.escape, rule_values)))
+    return rule_values, values_re
+
+
+def _tag_set(torrent) -> frozenset:
+    """Returns the torrent's tags as a set, parsing the comma-separated string once."""
+    tags = torrent.tags
+    if not tags:
+        return frozenset()
+    return frozenset(tag for tag in (t.strip() for t in tags.split(',')) if tag)
+
+
+def _has_tag(torrent, tag: str) -> bool:
+    """Returns True if the torrent carries the tag; torrents whose tag string cannot contain it are not split."""
+    tags = torrent.tags
+    if not tags or tag not in tags:
+        return False
+    return tag in _tag_set(torrent)
+
+
 def apply_rules_for_instance(instance, client, torrents):
     """
     Applies rules to a single instance.
@@ -134,81 +203,212 @@ def apply_rules_for_instance(instance, client, torrents):
     logger.info(f"Checking rules for instance: {instance.name}")
     logger.debug(f"Found {len(torrents)} torrents in '{instance.name}'.")
 
+    # Index the rules once per instance. Positions preserve rule order, so the first
+    # matching rule still wins. Tag rules are looked up by tag; tracker rules need a scan.
+    rules = list(instance.rules)
+    tag_index = defaultdict(list)  # tag -> positions of rules matching it
+    tracker_rules = []  # (position, pattern matching any of the rule values), in rule order
+    for position, rule in enumerate(rules):
+        rule_values, values_re = _rule_matcher(rule.condition_type, rule.condition_value)
+        if rule.condition_type == 'tag':
+            for rule_value in rule_values:
+                tag_index[rule_value].append(position)
+        elif values_re is not None:
+            tracker_rules.append((position, values_re))
+
+    if not tag_index and not tracker_rules:
+        logger.debug(f"No tag or tracker rules for '{instance.name}'. Skipping.")
+        return
+
+    # Each rule's limits and log details are read/formatted once here rather than per matched torrent
+    rule_limits = []  # position -> (name, ratio, seeding time, upload, download, details)
+    for rule in rules:
+        details_parts = []
+        if rule.share_limit_ratio is not None:
+            details_parts.append(f"Share Ratio: {rule.share_limit_ratio}")
+        if rule.share_limit_time is not None:
+            details_parts.append(f"Seeding Time: {rule.share_limit_time}m")
+        if rule.max_upload_speed is not None:
+            details_parts.append(f"Up: {rule.max_upload_speed // 1024}KiB/s")
+        if rule.max_download_speed is not None:
+            details_parts.append(f"Down: {rule.max_download_speed // 1024}KiB/s")
+        rule_limits.append((
+            rule.name,
+            rule.share_limit_ratio,
+            rule.share_limit_time,
+            rule.max_upload_speed,
+            rule.max_download_speed,
+            ", ".join(details_parts)
+        ))
+
+    # Hashes grouped by the limits to apply, so each distinct setting is one API call
+    pending_share = defaultdict(list)  # (ratio_limit, seeding_time_limit) -> hashes
+    pending_up = defaultdict(list)  # upload limit -> hashes
+    pending_down = defaultdict(list)  # download limit -> hashes
+    log_entries = []
+    instance_id = instance.id
+
     for torrent in torrents:
-        for rule in instance.rules:
-            matched = False
-            # Parse rule condition values (can be comma-separated for multi-select)
-            rule_values = [v.strip() for v in rule.condition_value.split(',') if v.strip()]
-            
-            # Robustly check for tag match - match if ANY rule value matches ANY torrent tag
-            if rule.condition_type == 'tag':
-                current_tags = [t.strip() for t in torrent.tags.split(',') if t.strip()]
-                for rule_value in rule_values:
-                    if rule_value in current_tags:
-                        matched = True
-                        break
+        # Tag match - match if ANY rule value matches ANY torrent tag. Untagged torrents
+        # (or instances without tag rules) go straight to the tracker check.
+        match_position = None
+        if tag_index and torrent.tags:
+            current_tags = _tag_set(torrent)
+            match_position = min(
+                (position for tag in current_tags for position in tag_index.get(tag, ())),
+                default=None
+            )
+
+        # Tracker match - match if ANY rule value matches ANY tracker. Trackers cost an
+        # API call, so they are fetched once and only if a tracker rule could still win.
+        if tracker_rules and (match_position is None or tracker_rules[0][0] < match_position):
+            tracker_urls = [tracker.url for tracker in torrent.trackers]
+            for position, values_re in tracker_rules:
+                if match_position is not None and position > match_position:
+                    break
+                if any(values_re.search(url) for url in tracker_urls):
+                    match_position = position
+                    break
+
+        if match_position is None:
+            continue
+        rule_name, ratio, seeding_time, upload, download, details = rule_limits[match_position]
+
+        # Check if the rule is already applied by comparing limits.
+        is_already_applied = (
+            (ratio is None or torrent.ratio_limit == ratio)
+            and (seeding_time is None or torrent.seeding_time_limit == seeding_time)
+            and (upload is None or torrent.up_limit == upload)
+            and (download is None or torrent.dl_limit == download)
+        )
+
+        if is_already_applied:
+            # Most matched torrents already conform every tick; let logging format only if DEBUG is on
+            logger.debug("Torrent '%s' already conforms to rule '%s'. Skipping.", torrent.name, rule_name)
+            continue
+
+        logger.info(f"Torrent '{torrent.name}' matched rule '{rule_name}'. Applying limits.")
+        torrent_hash = torrent.hash
+
+        # Set share limits only if they are defined in the rule
+        if ratio is not None or seeding_time is not None:
+            pending_share[(
+                ratio if ratio is not None else -2,
+                seeding_time if seeding_time is not None else -2
+            )].append(torrent_hash)
+        
+        # Set speed limits
+        if upload is not None:
+            pending_up[upload].append(torrent_hash)
+        if download is not None:
+            pending_down[download].append(torrent_hash)
+
+        # Log the action
+        log_entries.append(ActionLog(instance_id=instance_id, action=f"Applied rule '{rule_name}' to '{torrent.name}'", details=details))
+
+    for (ratio_limit, seeding_time_limit), hashes in pending_share.items():
+        client.torrents_set_share_limits(
+            torrent_hashes='|'.join(hashes),
+            ratio_limit=ratio_limit,
+            seeding_time_limit=seeding_time_limit,
+            inactive_seeding_time_limit=-2
+        )
+    for limit, hashes in pending_up.items():
+        client.torrents_set_upload_limit(limit=limit, torrent_hashes='|'.join(hashes))
+    for limit, hashes in pending_down.items():
+        client.torrents_set_download_limit(limit=limit, torrent_hashes='|'.join(hashes))
+
+    # bulk_save_objects sends its INSERT immediately, so it runs under the write lock with the commit
+    if log_entries:
+        with writing():
+            db.session.bulk_save_objects(log_entries)
+            db.session.commit()
+
+
+# torrents_files is one HTTP request per torrent. A pooled client keeps 10 connections, and the
+# scheduler never runs two tasks on the same client at once, so one pool of 8 per client fits.
+TORRENT_FILES_WORKERS = 8
+
+def _get_torrent_files(client, torrent, files_cache: Optional[Dict[str, Any]] = None):
+    """Returns the torrent's file list, fetching it at most once per scheduler cycle when a cache is given."""
+    if files_cache is None:
+        return client.torrents_files(torrent_hash=torrent.hash)
+    files = files_cache.get(torrent.hash)
+    if files is None:
+        files = client.torrents_files(torrent_hash=torrent.hash)
+        files_cache[torrent.hash] = files
+    return files
+
+def _prefetch_torrent_files(client, torrents, files_cache: Dict[str, Any]) -> None:
+    """Fetches file lists for the torrents not yet in files_cache, concurrently.
+
+    A torrent whose fetch fails is logged and left out of the cache.
+    """
+    missing = [torrent for torrent in torrents if torrent.hash not in files_cache]
+    if not missing:
+        return
+
+    def fetch(torrent):
+        try:
+            return client.torrents_files(torrent_hash=torrent.hash)
+        except Exception as e:
+            logger.warning(f"Error fetching files for torrent {torrent.name}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=TORRENT_FILES_WORKERS) as executor:
+        for torrent, files in zip(missing, executor.map(fetch, missing)):
+            if files is not None:
+                files_cache[torrent.hash] = files
+
+def _torrent_has_hard_link(client, torrent, qbt_download_dir, mapped_download_dir, files_cache=None, nlink_cache=None):
+    """Returns True if any of the torrent's files, mapped to a local path, has more than one link.
+
+    Cross-seeded torrents point at the same files, so when ``nlink_cache`` is given each
+    mapped path is stat()ed once per job (None records a missing file).
+    """
+    # Use torrent's save_path, which is what qBittorrent reports
+    torrent_save_path = torrent.save_path
+    
+    # Get the list of files for the torrent
+    files = _get_torrent_files(client, torrent, files_cache)
+
+    # Map the save path once; when it sits under the qBittorrent root (the usual case) each
+    # file's local path is a plain concatenation instead of join + relpath per file.
+    qbt_prefix = qbt_download_dir.rstrip('/') + '/'
+    save_prefix = torrent_save_path.rstrip('/') + '/'
+    local_prefix = None
+    if save_prefix.startswith(qbt_prefix):
+        local_prefix = mapped_download_dir.rstrip(os.sep) + os.sep + save_prefix[len(qbt_prefix):]
+
+    for file_info in files:
+        if local_prefix is not None:
+            mapped_path = local_prefix + file_info.name
+        else:
+            # Construct the full path as qBittorrent sees it
+            qbt_full_path = os.path.join(torrent_save_path, file_info.name)
             
-            # Check for tracker match - match if ANY rule value matches ANY tracker
-            elif rule.condition_type == 'tracker':
-                for tracker in torrent.trackers:
-                    for rule_value in rule_values:
-                        if rule_value in tracker.url:
-                            matched = True
-                            break
-                    if matched:
-                        break
+            # Translate to the path accessible by qPanel
+            if not qbt_full_path.startswith(qbt_download_dir):
+                continue
+            mapped_path = os.path.join(mapped_download_dir, os.path.relpath(qbt_full_path, qbt_download_dir))
             
-            if matched:
-                # Check if the rule is already applied by comparing limits.
-                is_already_applied = True
-                if rule.share_limit_ratio is not None and torrent.ratio_limit != rule.share_limit_ratio:
-                    is_already_applied = False
-                if rule.share_limit_time is not None and torrent.seeding_time_limit != rule.share_limit_time:
-                    is_already_applied = False
-                if rule.max_upload_speed is not None and torrent.up_limit != rule.max_upload_speed:
-                    is_already_applied = False
-                if rule.max_download_speed is not None and torrent.dl_limit != rule.max_download_speed:
-                    is_already_applied = False
-
-                if is_already_applied:
-                    logger.debug(f"Torrent '{torrent.name}' already conforms to rule '{rule.name}'. Skipping.")
-                else:
-                    logger.info(f"Torrent '{torrent.name}' matched rule '{rule.name}'. Applying limits.")
-
-                    # Set share limits only if they are defined in the rule
-                    if rule.share_limit_ratio is not None or rule.share_limit_time is not None:
-                        client.torrents_set_share_limits(
-                            torrent_hashes=torrent.hash,
-                            ratio_limit=rule.share_limit_ratio if rule.share_limit_ratio is not None else -2,
-                            seeding_time_limit=rule.share_limit_time if rule.share_limit_time is not None else -2,
-                            inactive_seeding_time_limit=-2
-                        )
-                    
-                    # Set speed limits
-                    if rule.max_upload_speed is not None:
-                        client.torrents_set_upload_limit(limit=rule.max_upload_speed, torrent_hashes=torrent.hash)
-                    if rule.max_download_speed is not None:
-                        client.torrents_set_download_limit(limit=rule.max_download_speed, torrent_hashes=torrent.hash)
-
-                    # Log the action
-                    details_parts = []
-                    if rule.share_limit_ratio is not None:
-                        details_parts.append(f"Share Ratio: {rule.share_limit_ratio}")
-                    if rule.share_limit_time is not None:
-                        details_parts.append(f"Seeding Time: {rule.share_limit_time}m")
-                    if rule.max_upload_speed is not None:
-                        details_parts.append(f"Up: {rule.max_upload_speed // 1024}KiB/s")
-                    if rule.max_download_speed is not None:
-                        details_parts.append(f"Down: {rule.max_download_speed // 1024}KiB/s")
-                    
-                    details = ", ".join(details_parts)
-                    log_entry = ActionLog(instance_id=instance.id, action=f"Applied rule '{rule.name}' to '{torrent.name}'", details=details)
-                    db.session.add(log_entry)
-                
-                # Once a rule is matched and applied, we can stop checking other rules for this torrent.
-                break
-
-def tag_torrents_with_no_hard_links(instance, client, torrents):
+        if nlink_cache is not None and mapped_path in nlink_cache:
+            nlink = nlink_cache[mapped_path]
+        else:
+            try:
+                nlink = os.stat(mapped_path).st_nlink
+            except OSError:
+                # Missing, unreadable (e.g. no search permission on a parent) or not a directory:
+                # treated like a missing file, as the os.path.exists() check used to
+                logger.debug("File not found: %s. Skipping hard link check for this file.", mapped_path)
+                nlink = None
+            if nlink_cache is not None:
+                nlink_cache[mapped_path] = nlink
+        if nlink is not None and nlink > 1:
+            return True  # A single hard-linked file is enough
+    return False
+
+def tag_torrents_with_no_hard_links(instance, client, torrents, files_cache=None):
     """Scheduled job to tag torrents with no hard links."""
     if not instance.qbt_download_dir or not instance.mapped_download_dir:
         logger.warning(f"Skipping no hard link check for instance '{instance.name}' because path mapping is not configured.")
@@ -216,130 +416,158 @@ def tag_torrents_with_no_hard_links(instance, client, torrents):
 
     try:
         logger.info(f"Checking for torrents with no hard links in '{instance.name}'.")
-        
+        now = datetime.now().timestamp()
+        qbt_download_dir = instance.qbt_download_dir
+        mapped_download_dir = instance.mapped_download_dir
+
+        # Only two outcomes depend on the hard-link state: untagging a tagged torrent and
+        # tagging one that finished over an hour ago. Every other torrent (most commonly
+        # ones still downloading) is skipped without fetching its files or stat()ing them.
+        candidates = []
         for torrent in torrents:
-            has_hard_link = False
-            # Use torrent's save_path, which is what qBittorrent reports
-            torrent_save_path = torrent.save_path
-            
-            # Get the list of files for the torrent
-            files = client.torrents_files(torrent_hash=torrent.hash)
-
-            for file_info in files:
-                # Construct the full path as qBittorrent sees it
-                qbt_full_path = os.path.join(torrent_save_path, file_info.name)
-                
-                # Translate to the path accessible by qPanel
-                if qbt_full_path.startswith(instance.qbt_download_dir):
-                    mapped_path = os.path.join(instance.mapped_download_dir, os.path.relpath(qbt_full_path, instance.qbt_download_dir))
-                    
-                    try:
-                        if os.path.exists(mapped_path) and os.stat(mapped_path).st_nlink > 1:
-                            has_hard_link = True
-                            break  # A single hard-linked file is enough
-                    except FileNotFoundError:
-                        logger.debug(f"File not found: {mapped_path}. Skipping hard link check for this file.")
-
             # Robustly check for and manage the 'noHL' tag
-            current_tags = [t.strip() for t in torrent.tags.split(',') if t.strip()]
-            has_noHL_tag = 'noHL' in current_tags
-
+            has_noHL_tag = _has_tag(torrent, 'noHL')
+            # completion_on is a Unix epoch, so compare seconds directly
+            if has_noHL_tag or (torrent.completion_on > 0 and now - torrent.completion_on > 3600):
+                candidates.append((torrent, has_noHL_tag))
+
+        # File lists are fetched concurrently; tagging decisions and DB writes stay on this thread
+        nlink_cache: Dict[str, Optional[int]] = {}  # mapped path -> st_nlink, shared by cross-seeds
+        with ThreadPoolExecutor(max_workers=TORRENT_FILES_WORKERS) as executor:
+            hard_link_results = list(executor.map(
+                lambda candidate: _torrent_has_hard_link(client, candidate[0], qbt_download_dir, mapped_download_dir, files_cache, nlink_cache),
+                candidates
+            ))
+
+        categories_to_remove = []
+        if instance.remove_category_on_nohl_removal and instance.nohl_removal_categories:
+            categories_to_remove = [c.strip() for c in instance.nohl_removal_categories.split(',') if c.strip()]
+
+        to_untag = []
+        to_tag = []
+        to_clear_category = []
+        log_entries = []
+        for (torrent, has_noHL_tag), has_hard_link in zip(candidates, hard_link_results):
             if has_hard_link:
                 if has_noHL_tag:
-                    client.torrents_remove_tags(tags='noHL', torrent_hashes=torrent.hash)
-                    logger.info(f"Removed 'noHL' tag from '{torrent.name}' as it now has hard links.")
-                    
-                    # Reset share limits to global settings when noHL tag is removed
-                    client.torrents_set_share_limits(
-                        torrent_hashes=torrent.hash,
-                        ratio_limit=-1,  # Use global settings
-                        seeding_time_limit=-1,  # Use global settings
-                        inactive_seeding_time_limit=-1  # Use global settings
-                    )
-                    logger.info(f"Reset share limits for '{torrent.name}' to global settings.")
-                    
-                    # Log action
-                    log_entry = ActionLog(
-                        instance_id=instance.id,
-                        action=f"Removed 'noHL' tag from '{torrent.name}'",
-                        details="Torrent now has hard links. Share limits reset to global settings."
-                    )
-                    db.session.add(log_entry)
-            else:
-                if not has_noHL_tag:
-                    if torrent.completion_on > 0:
-                        completion_time = datetime.fromtimestamp(torrent.completion_on)
-                        if datetime.now() - completion_time > timedelta(hours=1):
-                            client.torrents_add_tags(tags='noHL', torrent_hashes=torrent.hash)
-                            logger.info(f"Added 'noHL' tag to '{torrent.name}' as it has no hard links and was completed over an hour ago.")
-
-                            # Remove specified categories when noHL tag is set
-                            if instance.remove_category_on_nohl_removal and instance.nohl_removal_categories:
-                                categories_to_remove = [c.strip() for c in instance.nohl_removal_categories.split(',') if c.strip()]
-                                current_category = torrent.category.strip() if torrent.category else ''
-                                if current_category in categories_to_remove:
-                                    client.torrents_set_category(category='', torrent_hashes=torrent.hash)
-                                    logger.info(f"Removed category '{current_category}' from '{torrent.name}' after noHL tag was set.")
+                    to_untag.append(torrent)
+            elif not has_noHL_tag:
+                to_tag.append(torrent)
+
+                # Remove specified categories when noHL tag is set
+                current_category = torrent.category.strip() if torrent.category else ''
+                if current_category in categories_to_remove:
+                    to_clear_category.append(torrent)
+
+        # One API call per action for the whole instance
+        if to_untag:
+            untag_hashes = '|'.join(t.hash for t in to_untag)
+            client.torrents_remove_tags(tags='noHL', torrent_hashes=untag_hashes)
+            # Reset share limits to global settings when noHL tag is removed
+            client.torrents_set_share_limits(
+                torrent_hashes=untag_hashes,
+                ratio_limit=-1,  # Use global settings
+                seeding_time_limit=-1,  # Use global settings
+                inactive_seeding_time_limit=-1  # Use global settings
+            )
+            for torrent in to_untag:
+                logger.info(f"Removed 'noHL' tag from '{torrent.name}' as it now has hard links. Share limits reset to global settings.")
+                
+                # Log action
+                log_entry = ActionLog(
+                    instance_id=instance.id,
+                    action=f"Removed 'noHL' tag from '{torrent.name}'",
+                    details="Torrent now has hard links. Share limits reset to global settings."
+                )
+                log_entries.append(log_entry)
+
+        if to_tag:
+            client.torrents_add_tags(tags='noHL', torrent_hashes='|'.join(t.hash for t in to_tag))
+            for torrent in to_tag:
+                logger.info(f"Added 'noHL' tag to '{torrent.name}' as it has no hard links and was completed over an hour ago.")
+
+        if to_clear_category:
+            client.torrents_set_category(category='', torrent_hashes='|'.join(t.hash for t in to_clear_category))
+            for torrent in to_clear_category:
+                logger.info(f"Removed category '{torrent.category.strip()}' from '{torrent.name}' after noHL tag was set.")
+
+        if log_entries:
+            with writing():
+                db.session.bulk_save_objects(log_entries)
+                db.session.commit()
         
     except Exception as e:
         logger.error(f"Failed to check for no hard links for {instance.name}: {e}")
-
-def tag_unregistered_torrents_for_instance(instance, client, torrents):
+        db.session.rollback()
+
+UNREGISTERED_STATUS_SUBSTRINGS = (
+    "unregistered",
+    "Torrent has been deleted",
+    "Torrent not registered with this tracker",
+    "Torrent is not authorized for use on this tracker",
+    "This torrent does not exist",
+    "Torrent not found",
+)
+# One case-insensitive alternation scans each tracker message once instead of once per substring
+UNREGISTERED_STATUS_RE = re.compile('|'.join(map(re.escape, UNREGISTERED_STATUS_SUBSTRINGS)), re.IGNORECASE)
+
+def tag_unregistered_torrents_for_instance(instance, client, torrents, settings):
     """Tags torrents with 'unregistered' if their tracker status indicates they are no longer registered."""
-    UNREGISTERED_STATUS_SUBSTRINGS = [
-        "unregistered",
-        "Torrent has been deleted",
-        "Torrent not registered with this tracker",
-        "Torrent is not authorized for use on this tracker",
-        "This torrent does not exist",
-        "Torrent not found"
-    ]
-    
+    notify_lines = []
+    to_tag = []
+    to_untag = []
+    new_rows = []
     for torrent in torrents:
         is_unregistered = False
         offending_msg = ""
         for tracker in torrent.trackers:
-            for status_substring in UNREGISTERED_STATUS_SUBSTRINGS:
-                if status_substring.lower() in tracker.msg.lower():
-                    is_unregistered = True
-                    offending_msg = tracker.msg
-                    break
-            if is_unregistered:
+            # Working trackers usually report an empty status message; skip those outright
+            if tracker.msg and UNREGISTERED_STATUS_RE.search(tracker.msg):
+                is_unregistered = True
+                offending_msg = tracker.msg
                 break
 
         # Robustly check for and manage the 'unregistered' tag
-        current_tags = [t.strip() for t in torrent.tags.split(',') if t.strip()]
-        has_unregistered_tag = 'unregistered' in current_tags
+        has_unregistered_tag = _has_tag(torrent, 'unregistered')
 
         if is_unregistered:
             if not has_unregistered_tag:
-                client.torrents_add_tags(tags='unregistered', torrent_hashes=torrent.hash)
+                to_tag.append(torrent.hash)
                 logger.info(f"Tagged '{torrent.name}' as unregistered on {instance.name}.")
                 log_entry = ActionLog(instance_id=instance.id, action=f"Tagged '{torrent.name}' as unregistered", details=f"Tracker status: {offending_msg}")
-                db.session.add(log_entry)
-
-                # Send notification
-                settings = load_settings()
-                message = f"Tagged '{torrent.name}' as unregistered on '{instance.name}'.\nTracker status: {offending_msg}"
-                if send_notification(message, settings, parse_mode='HTML'):
-                    new_message = TelegramMessage(message=message)
-                    db.session.add(new_message)
+                new_rows.append(log_entry)
+
+                # Queue notification; sent combined once all torrents are checked
+                notify_lines.append(f"Tagged '{torrent.name}' as unregistered on '{instance.name}'.\nTracker status: {offending_msg}")
         else:
             if has_unregistered_tag:
-                client.torrents_remove_tags(tags='unregistered', torrent_hashes=torrent.hash)
+                to_untag.append(torrent.hash)
                 logger.info(f"Removed 'unregistered' tag from '{torrent.name}' on {instance.name}.")
-                
-                # Reset share limits to global settings when unregistered tag is removed
-                client.torrents_set_share_limits(
-                    torrent_hashes=torrent.hash,
-                    ratio_limit=-1,  # Use global settings
-                    seeding_time_limit=-1,  # Use global settings
-                    inactive_seeding_time_limit=-1  # Use global settings
-                )
                 logger.info(f"Reset share limits for '{torrent.name}' to global settings.")
                 
                 log_entry = ActionLog(instance_id=instance.id, action=f"Removed 'unregistered' tag from '{torrent.name}'", details="Tracker status is now normal. Share limits reset to global settings.")
-                db.session.add(log_entry)
+                new_rows.append(log_entry)
+
+    # One API call per action for the whole instance
+    if to_tag:
+        client.torrents_add_tags(tags='unregistered', torrent_hashes='|'.join(to_tag))
+    if to_untag:
+        untag_hashes = '|'.join(to_untag)
+        client.torrents_remove_tags(tags='unregistered', torrent_hashes=untag_hashes)
+        # Reset share limits to global settings when unregistered tag is removed
+        client.torrents_set_share_limits(
+            torrent_hashes=untag_hashes,
+            ratio_limit=-1,  # Use global settings
+            seeding_time_limit=-1,  # Use global settings
+            inactive_seeding_time_limit=-1  # Use global settings
+        )
+
+    if new_rows:
+        with writing():
+            db.session.bulk_save_objects(new_rows)
+            db.session.commit()
+    # Sent and recorded by the notification worker, off the scheduler thread
+    queue_notifications(notify_lines, settings, parse_mode='HTML')
 
 
 # Legacy job functions kept for backwards compatibility (can be removed later)
@@ -360,26 +588,57 @@ def detect_orphaned_files_job():
     run_all_jobs()
 
 
-def _map_qbt_path_to_local(instance: Instance, qbt_path: str) -> Optional[str]:
+def _is_within(path: str, root: str) -> bool:
+    """Cheap containment test for normalized absolute paths (root itself counts as within)."""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+def _mapping_roots(instance: Instance) -> Optional[Tuple[str, str]]:
+    """Returns the instance's (qBittorrent root, local root), normalized, or None if mapping is not configured."""
+    if not instance.qbt_download_dir or not instance.mapped_download_dir:
+        return None
+    try:
+        return (
+            os.path.realpath(os.path.normpath(instance.qbt_download_dir)),
+            os.path.realpath(os.path.normpath(instance.mapped_download_dir))
+        )
+    except Exception:
+        return None
+
+def _map_qbt_path_to_local(instance: Instance, qbt_path: str, roots: Optional[Tuple[str, str]] = None) -> Optional[str]:
     """Translate a qBittorrent-visible path to the local filesystem path using the instance mapping.
 
+    ``roots`` may be passed from _mapping_roots() so callers mapping many paths resolve them once.
     Returns None if mapping is not configured or the path does not fall under the mapped root.
     """
-    if not instance.qbt_download_dir or not instance.mapped_download_dir:
+    if roots is None:
+        roots = _mapping_roots(instance)
+    if roots is None:
         return None
     try:
-        normalized_qbt_root = os.path.realpath(os.path.normpath(instance.qbt_download_dir))
-        normalized_local_root = os.path.realpath(os.path.normpath(instance.mapped_download_dir))
+        normalized_qbt_root, normalized_local_root = roots
         normalized_qbt_path = os.path.realpath(os.path.normpath(qbt_path))
 
-        if os.path.commonpath([normalized_qbt_path, normalized_qbt_root]) == normalized_qbt_root:
+        if _is_within(normalized_qbt_path, normalized_qbt_root):
             rel = os.path.relpath(normalized_qbt_path, normalized_qbt_root)
             return os.path.realpath(os.path.normpath(os.path.join(normalized_local_root, rel)))
         return None
     except Exception:
         return None
 
-def _collect_expected_local_paths_from_cache(instance: Instance, client, torrents, group_mapped_root: Optional[str] = None) -> Set[str]:
+def _resolve_save_path(instance: Instance, save_path: str, group_root_real: Optional[str], roots: Optional[Tuple[str, str]] = None) -> Optional[str]:
+    """Resolve a torrent save path to the local directory its files live under, or None if it is not visible."""
+    local_path = _map_qbt_path_to_local(instance, save_path, roots)
+    if local_path:
+        return local_path
+
+    qbt_real = os.path.realpath(os.path.normpath(save_path))
+    # Fallback: if qbt path is already under the group mapped root, accept it
+    if group_root_real:
+        return qbt_real if _is_within(qbt_real, group_root_real) else None
+    # No group root, but maybe qbt path is directly usable
+    return qbt_real
+
+def _collect_expected_local_paths_from_cache(instance: Instance, client, torrents, group_mapped_root: Optional[str] = None, files_cache: Optional[Dict[str, Any]] = None) -> Set[str]:
     """Build a set of expected file paths using pre-fetched torrent data.
     
     This is the optimized version that doesn't re-fetch torrents.
@@ -389,31 +648,31 @@ def _collect_expected_local_paths_from_cache(instance: Instance, client, torrent
     logger.debug(f"Collecting expected paths for instance '{instance.name}' (qbt_dir: {instance.qbt_download_dir}, mapped_dir: {instance.mapped_download_dir})")
     logger.debug(f"Processing {len(torrents)} torrents from instance '{instance.name}'")
     
+    # Torrents mostly share a handful of save paths, so the expensive realpath-based
+    # mapping runs once per distinct save path and file names are simply joined on.
+    save_path_roots: Dict[str, Optional[str]] = {}
+    mapping_roots = _mapping_roots(instance)  # the instance roots are resolved once, not per save path
+    # File lists not already fetched this cycle are requested concurrently up front
+    if files_cache is None:
+        files_cache = {}
+    _prefetch_torrent_files(client, torrents, files_cache)
     for torrent in torrents:
         try:
-            files = client.torrents_files(torrent_hash=torrent.hash)
+            files = files_cache.get(torrent.hash)
+            if files is None:
+                continue
             torrent_save_path = torrent.save_path
-            
-            for f in files:
-                qbt_full_path = os.path.join(torrent_save_path, f.name)
-                local_path = _map_qbt_path_to_local(instance, qbt_full_path)
-                if local_path:
-                    real_local = os.path.realpath(local_path)
-                    expected.add(real_local)
-                    continue
-                    
-                # Fallback: if qbt path is already under the group mapped root, accept it
-                if group_root_real:
-                    qbt_real = os.path.realpath(os.path.normpath(qbt_full_path))
-                    try:
-                        if os.path.commonpath([qbt_real, group_root_real]) == group_root_real:
-                            expected.add(qbt_real)
-                    except Exception:
-                        pass
-                else:
-                    # No group root, but maybe qbt path is directly usable
-                    qbt_real = os.path.realpath(os.path.normpath(qbt_full_path))
-                    expected.add(qbt_real)
+
+            if torrent_save_path not in save_path_roots:
+                save_path_roots[torrent_save_path] = _resolve_save_path(instance, torrent_save_path, group_root_real, mapping_roots)
+            local_root = save_path_roots[torrent_save_path]
+            if not local_root:
+                continue
+
+            # local_root is already normalized and qBittorrent file names are clean relative
+            # paths, so plain concatenation replaces os.path.join + normpath per file
+            prefix = local_root.rstrip(os.sep) + os.sep
+            expected.update([prefix + f.name for f in files])
         except Exception as e:
             logger.warning(f"Error processing torrent {torrent.name}: {e}")
             continue
@@ -432,44 +691,120 @@ def _collect_inodes(paths: Set[str]) -> Set[Tuple[int, int]]:
             continue
     return inodes
 
-def _find_orphaned_files(mapped_root: str, expected_paths: Set[str], expected_inodes: Set[Tuple[int, int]], min_age_days: int, ignore_patterns: Optional[List[str]] = None) -> List[str]:
-    """Walk the mapped root and find files not present in expected paths, older than threshold."""
+# stat() releases the GIL, so directories are scanned concurrently; helps most on network mounts
+ORPHAN_SCAN_WORKERS = 8
+
+# Leading global flags such as "(?i)" are only valid at the start of the whole pattern
+_GLOBAL_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+def _fuse_patterns(compiled: List[re.Pattern]) -> Tuple[re.Pattern, ...]:
+    """Joins compiled patterns into as few regexes as is safe.
+
+    Patterns with groups (named groups would clash and backreference numbers would shift) or
+    in verbose mode (a trailing comment would swallow the wrapper's ')') stay separate, as does
+    everything if the joined alternation fails to compile.
+    """
+    separate = [rx for rx in compiled if rx.groups or rx.flags & re.VERBOSE]
+    joinable = [rx for rx in compiled if not (rx.groups or rx.flags & re.VERBOSE)]
+    if len(joinable) > 1:
+        parts = []
+        for rx in joinable:
+            flags = _GLOBAL_FLAGS_RE.match(rx.pattern)
+            parts.append(f"(?{flags.group(1)}:{rx.pattern[flags.end():]})" if flags else f"(?:{rx.pattern})")
+        try:
+            joinable = [re.compile('|'.join(parts))]
+        except re.error:
+            pass
+    return tuple(joinable + separate)
+
+@lru_cache(maxsize=8)
+def _compile_ignore(patterns: Tuple[str, ...]) -> Tuple[Tuple[re.Pattern, ...], Tuple[re.Pattern, ...]]:
+    """Compiles ignore patterns into (file matchers, directory matchers), fused where safe.
+
+    Patterns ending in '/' also prune whole directories. Invalid regexes are logged and dropped.
+    Compiled once per distinct pattern list rather than on every scan.
+    """
+    compiled: List[re.Pattern] = []
+    for p in patterns:
+        try:
+            compiled.append(re.compile(p))
+        except re.error as e:
+            logger.warning(f"Ignoring invalid orphan ignore pattern '{p}': {e}")
+    return _fuse_patterns(compiled), _fuse_patterns([rx for rx in compiled if rx.pattern.endswith('/')])
+
+def _scan_dir_for_orphans(dir_path: str, expected_inodes: Set[Tuple[int, int]], now: float, min_age_seconds: int, ignore_rxs: Tuple[re.Pattern, ...], dir_ignore_rxs: Tuple[re.Pattern, ...]) -> Tuple[List[str], List[str]]:
+    """Scan a single directory, returning (orphaned files in it, subdirectories to descend into).
+
+    Subdirectories whose path (with a trailing separator) matches a directory pattern are not descended into.
+    """
+    orphans: List[str] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        # Plain files share their directory's device, so with the inode number that
+        # readdir already returned, expected files are recognized without a stat() each.
+        dir_dev = os.stat(dir_path).st_dev
+    except OSError:
+        # Unreadable or vanished directory; os.walk skipped these silently too
+        return orphans, subdirs
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                # Like os.walk, symlinked directories are listed but not descended into
+                if not entry.is_symlink():
+                    # Every file below a matched directory would be ignored anyway; skip the subtree
+                    if dir_ignore_rxs and any(rx.search(entry.path + os.sep) for rx in dir_ignore_rxs):
+                        continue
+                    subdirs.append(entry.path)
+                continue
+        except OSError:
+            continue
+        full_path = entry.path
+        # Apply ignore patterns, if any
+        if ignore_rxs and any(rx.search(full_path) for rx in ignore_rxs):
+            continue
+        try:
+            if (dir_dev, entry.inode()) in expected_inodes and not entry.is_symlink():
+                continue
+            stat = entry.stat()
+            age = now - stat.st_mtime
+            # If the inode matches a known expected file, skip
+            if (stat.st_dev, stat.st_ino) in expected_inodes:
+                continue
+            if age >= min_age_seconds:
+                orphans.append(full_path)
+        except FileNotFoundError:
+            # File disappeared during scan; ignore
+            continue
+        except PermissionError:
+            # Ignore unreadable files
+            continue
+    return orphans, subdirs
+
+def _find_orphaned_files(mapped_root: str, expected_inodes: Set[Tuple[int, int]], min_age_days: int, ignore_patterns: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """Walk the mapped root and find files whose inode is not an expected torrent file, older than threshold.
+
+    Matching on (st_dev, st_ino) also catches hard links and alternate paths to expected files,
+    so no path normalization is needed per walked file.
+    """
     orphans: List[str] = []
     if not mapped_root or not os.path.isdir(mapped_root):
         return orphans
     now = datetime.now().timestamp()
     min_age_seconds = max(0, min_age_days) * 24 * 3600
-    compiled: List[re.Pattern] = []
-    if ignore_patterns:
-        for p in ignore_patterns:
-            try:
-                compiled.append(re.compile(p))
-            except re.error:
-                # Skip invalid regex
-                continue
+    ignore_rxs, dir_ignore_rxs = _compile_ignore(tuple(ignore_patterns or ()))
+    # The root is resolved once; entries below it are reported by their walked path.
     real_root = os.path.realpath(mapped_root)
-    for dirpath, dirnames, filenames in os.walk(real_root):
-        for filename in filenames:
-            full_path = os.path.realpath(os.path.normpath(os.path.join(dirpath, filename)))
-            # Apply ignore patterns, if any
-            if compiled and any(rx.search(full_path) for rx in compiled):
-                continue
-            if full_path in expected_paths:
-                continue
-            try:
-                stat = os.stat(full_path)
-                age = now - stat.st_mtime
-                # If the inode matches a known expected file, skip
-                if (stat.st_dev, stat.st_ino) in expected_inodes:
-                    continue
-                if age >= min_age_seconds:
-                    orphans.append(full_path)
-            except FileNotFoundError:
-                # File disappeared during scan; ignore
-                continue
-            except PermissionError:
-                # Ignore unreadable files
-                continue
+    with ThreadPoolExecutor(max_workers=ORPHAN_SCAN_WORKERS) as executor:
+        pending = {executor.submit(_scan_dir_for_orphans, real_root, expected_inodes, now, min_age_seconds, ignore_rxs, dir_ignore_rxs)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dir_orphans, subdirs = future.result()
+                orphans.extend(dir_orphans)
+                for subdir in subdirs:
+                    pending.add(executor.submit(_scan_dir_for_orphans, subdir, expected_inodes, now, min_age_seconds, ignore_rxs, dir_ignore_rxs))
     return orphans
 
 def detect_orphaned_files_job_optimized(instance_cache: Dict[int, Dict[str, Any]]):
@@ -504,7 +839,8 @@ def detect_orphaned_files_job_optimized(instance_cache: Dict[int, Dict[str, Any]
             inst_paths = _collect_expected_local_paths_from_cache(
                 cache['instance'], 
                 cache['client'], 
-                cache['torrents']
+                cache['torrents'],
+                files_cache=cache.get('files')
             )
             global_expected_paths |= inst_paths
         except Exception as e:
@@ -524,19 +860,20 @@ def detect_orphaned_files_job_optimized(instance_cache: Dict[int, Dict[str, Any]
         try:
             min_age_days = instance.orphaned_min_age_days or 7
             ignore_patterns_raw = instance.orphaned_ignore_patterns or ''
-            ignore_patterns = [p.strip() for p in ignore_patterns_raw.splitlines() if p.strip()]
+            ignore_patterns = tuple(p.strip() for p in ignore_patterns_raw.splitlines() if p.strip())
             
             mapped_root = os.path.realpath(os.path.normpath(instance.mapped_download_dir))
             logger.info(f"Scanning mapped root '{mapped_root}' for orphans (instance: {instance.name})")
             
-            orphaned = _find_orphaned_files(mapped_root, global_expected_paths, global_expected_inodes, min_age_days, ignore_patterns)
+            orphaned = _find_orphaned_files(mapped_root, global_expected_inodes, min_age_days, ignore_patterns)
             logger.info(f"Found {len(orphaned)} orphaned files for instance '{instance.name}'")
             
+            new_rows = []
             if orphaned:
                 # Get existing orphaned file paths for this instance to avoid duplicates
-                existing_paths = {
-                    of.file_path for of in OrphanedFile.query.filter_by(instance_id=instance.id).all()
-                }
+                existing_paths = set(db.session.scalars(
+                    db.select(OrphanedFile.file_path).filter_by(instance_id=instance.id)
+                ))
                 
                 new_orphans = [o for o in orphaned if o not in existing_paths]
                 logger.info(f"Found {len(new_orphans)} NEW orphaned files for instance '{instance.name}'")
@@ -550,23 +887,31 @@ def detect_orphaned_files_job_optimized(instance_cache: Dict[int, Dict[str, Any]
                         file_size = None
                         file_mtime = None
                     
-                    db.session.add(OrphanedFile(
+                    new_rows.append(OrphanedFile(
                         instance_id=instance.id,
                         file_path=orphan_path,
                         file_size=file_size,
                         file_mtime=file_mtime
                     ))
-                
-                if new_orphans:
-                    db.session.commit()
-                    logger.info(f"Saved {len(new_orphans)} new orphaned files for instance '{instance.name}'")
             
             # Clean up entries for files that no longer exist or are no longer orphaned
-            existing_entries = OrphanedFile.query.filter_by(instance_id=instance.id).all()
-            for entry in existing_entries:
-                if not os.path.exists(entry.file_path) or entry.file_path in global_expected_paths:
-                    db.session.delete(entry)
-            db.session.commit()
+            stale_ids = [
+                entry_id for entry_id, file_path in db.session.execute(
+                    db.select(OrphanedFile.id, OrphanedFile.file_path).filter_by(instance_id=instance.id)
+                )
+                if not os.path.exists(file_path) or file_path in global_expected_paths
+            ]
+
+            # Both statements execute immediately, so they run under the write lock with the commit
+            if new_rows or stale_ids:
+                with writing():
+                    if new_rows:
+                        db.session.bulk_save_objects(new_rows)
+                    if stale_ids:
+                        db.session.execute(db.delete(OrphanedFile).where(OrphanedFile.id.in_(stale_ids)))
+                    db.session.commit()
+                if new_rows:
+                    logger.info(f"Saved {len(new_rows)} new orphaned files for instance '{instance.name}'")
             
         except Exception as e:
             logging.error(f"An unexpected error occurred in detect_orphaned_files_job for instance '{instance.name}': {e}")